@@ -8,7 +8,9 @@ import streamlit as st
 import pandas as pd
 
 from src.api import (
-    load_all_data,
+    load_trans,
+    load_rate,
+    load_pop,
     get_gu_list,
     get_apt_list,
     get_area_list,
@@ -16,12 +18,68 @@ from src.api import (
     train_rl_for_state_df,
     simulate_future_12months,  # 🔥 12개월 시나리오 예측 함수
 )
+from src.menu_select import format_area
 
 
-@st.cache_data
-def load_data_cached():
-    trans_df, monthly_rate, monthly_pop = load_all_data()
-    return trans_df, monthly_rate, monthly_pop
+# 원본 DataFrame들은 세션 간 공유 객체로 캐시 (rerun마다 pickle 복사 X).
+# 같은 객체가 그대로 반환되므로 호출하는 쪽에서 in-place 수정은 금지
+# (필터/컬럼 추가는 항상 새 DataFrame에서 수행).
+
+@st.cache_resource
+def load_trans_cached():
+    return load_trans()
+
+
+# 금리/인구는 아파트/평형까지 선택된 뒤에만 로딩 (첫 화면 표시를 막지 않도록)
+
+@st.cache_resource
+def load_rate_cached():
+    return load_rate()
+
+
+@st.cache_resource
+def load_pop_cached():
+    return load_pop()
+
+
+# state_df는 (구, 아파트, 평형) 조합별로 캐시 → 슬라이더/탭 조작으로 rerun 되어도 다시 집계하지 않음.
+# 큰 DataFrame 대신 선택값 3개만 해시하도록, 원본 데이터는 내부에서 캐시된 로더로 가져온다.
+
+@st.cache_data(show_spinner=False)
+def build_state_df_cached(selected_gu, selected_apt, selected_area):
+    return build_state_df_for_apt(
+        load_trans_cached(),
+        selected_gu,
+        selected_apt,
+        selected_area,
+        load_rate_cached(),
+        load_pop_cached(),
+    )
+
+
+# 학습 결과는 (state_df 내용, 에피소드 수, seed) 기준으로 캐시 → 같은 조건으로 다시 누르면 즉시 반환.
+# state_df는 내용 해시로 비교하므로, 내용이 바뀌면 자동으로 다시 학습한다.
+
+@st.cache_data(
+    show_spinner=False,
+    hash_funcs={pd.DataFrame: lambda df: pd.util.hash_pandas_object(df, index=True).values.tobytes()},
+)
+def train_rl_cached(state_df, episodes, seed=0):
+    return train_rl_for_state_df(state_df, episodes=episodes, seed=seed)
+
+
+PLACEHOLDER = "선택하세요"
+
+
+def _cached_options(cache_key, load_items):
+    """
+    selectbox 옵션 (PLACEHOLDER, *목록) 튜플을 session_state에 캐시해서
+    rerun마다 리스트를 새로 만들지 않도록 한다.
+    """
+    cache = st.session_state.setdefault("_option_cache", {})
+    if cache_key not in cache:
+        cache[cache_key] = (PLACEHOLDER, *load_items())
+    return cache[cache_key]
 
 
 def main():
@@ -33,40 +91,44 @@ def main():
     st.caption("Q-learning 기반 강화학습 모델을 활용한 가격 방향 예측 시스템")
     st.markdown("---")
 
-    # 데이터 로딩
-    trans_df, monthly_rate, monthly_pop = load_data_cached()
+    # 데이터 로딩 (실거래가만; 금리/인구는 아래에서 필요할 때 로딩)
+    trans_df = load_trans_cached()
 
     # ---------- 사이드바: 구 / 아파트 / 평형 선택 ----------
     with st.sidebar:
         st.header("아파트 선택")
         
         with st.expander("지역 및 아파트 정보", expanded=True):
-            gu_list = get_gu_list(trans_df)
-            # 초기값을 빈 값으로 설정하기 위해 placeholder 추가
-            gu_options = ["선택하세요"] + gu_list
+            # 초기값을 빈 값으로 설정하기 위해 placeholder 추가 (옵션 튜플은 session_state에 캐시)
+            gu_options = _cached_options(("gu",), lambda: get_gu_list(trans_df))
             selected_gu = st.selectbox("구 선택", gu_options, key="gu_select", index=0)
             # placeholder가 선택된 경우 None으로 처리
-            if selected_gu == "선택하세요":
+            if selected_gu == PLACEHOLDER:
                 selected_gu = None
 
-            apt_list = []
-            if selected_gu:
-                apt_list = get_apt_list(trans_df, selected_gu)
-            
             # 아파트 선택: 선택된 구가 있을 때만 활성화
-            apt_options = ["선택하세요"] + apt_list if apt_list else ["선택하세요"]
+            apt_options = (PLACEHOLDER,)
+            if selected_gu:
+                apt_options = _cached_options(
+                    ("apt", selected_gu), lambda: get_apt_list(trans_df, selected_gu)
+                )
             selected_apt = st.selectbox("아파트 선택", apt_options, key="apt_select", index=0, disabled=(selected_gu is None))
-            if selected_apt == "선택하세요":
+            if selected_apt == PLACEHOLDER:
                 selected_apt = None
 
-            area_list = []
-            if selected_gu and selected_apt:
-                area_list = get_area_list(trans_df, selected_gu, selected_apt)
-            
             # 평형 선택: 구와 아파트가 모두 선택되었을 때만 활성화
-            area_options = ["선택하세요"] + area_list if area_list else ["선택하세요"]
-            selected_area = st.selectbox("평형 선택", area_options, key="area_select", index=0, disabled=(selected_apt is None))
-            if selected_area == "선택하세요":
+            area_options = (PLACEHOLDER,)
+            if selected_gu and selected_apt:
+                area_options = _cached_options(
+                    ("area", selected_gu, selected_apt),
+                    lambda: get_area_list(trans_df, selected_gu, selected_apt),
+                )
+            selected_area = st.selectbox(
+                "평형 선택", area_options, key="area_select", index=0, disabled=(selected_apt is None),
+                # area는 float이므로 84.0 → "84" 처럼 표시
+                format_func=format_area,
+            )
+            if selected_area == PLACEHOLDER:
                 selected_area = None
 
         st.markdown("---")
@@ -87,19 +149,12 @@ def main():
         with col2:
             st.metric("아파트", selected_apt)
         with col3:
-            st.metric("평형", f"{selected_area} ㎡")
+            st.metric("평형", f"{format_area(selected_area)} ㎡")
         
         st.markdown("---")
 
-        # state_df 생성
-        state_df = build_state_df_for_apt(
-            trans_df,
-            selected_gu,
-            selected_apt,
-            selected_area,
-            monthly_rate,
-            monthly_pop,
-        )
+        # state_df 생성 (금리/인구 데이터도 이 시점에 처음 로딩)
+        state_df = build_state_df_cached(selected_gu, selected_apt, selected_area)
 
         if state_df.empty:
             st.error("⚠️ 해당 아파트/평형에 대한 월별 데이터가 부족합니다.")
@@ -146,7 +201,7 @@ def main():
 
         if train_button:
             with st.spinner("강화학습 에이전트 학습 중... 잠시만 기다려주세요."):
-                Q, episode_rewards, metrics, history_df = train_rl_for_state_df(
+                Q, episode_rewards, metrics, history_df = train_rl_cached(
                     state_df,
                     episodes=episodes,
                 )
@@ -269,9 +324,12 @@ def main():
                 st.subheader("평가 에피소드 상세 로그")
                 st.caption("탐욕 정책(greedy policy)으로 1회 실행한 결과입니다.")
 
-                action_map = {0: "하락 예측", 1: "보합 예측", 2: "상승 예측"}
-                history_df = history_df.copy()
-                history_df["action_label"] = history_df["action_id"].map(action_map)
+                history_df = history_df.assign(
+                    action_label=pd.Categorical.from_codes(
+                        history_df["action_id"],
+                        categories=["하락 예측", "보합 예측", "상승 예측"],
+                    )
+                )
 
                 show_cols = ["step", "current_ym", "next_ym",
                              "action_label", "true_direction_label", "reward"]
@@ -14,7 +14,8 @@ from src.data_loader import load_transaction_data
 from src.menu_select import (
     select_gu_menu,
     select_apt_menu,
-    select_area_menu
+    select_area_menu,
+    format_area,
 )
 from src.preprocess import (
     filter_one_apt,
@@ -35,14 +36,17 @@ import matplotlib.pyplot as plt
 import numpy as np
 
 
-def main():
+def main(verbose: bool = True):
+    """
+    verbose=False 이면 중간 DataFrame 미리보기 출력을 생략.
+    """
     # ---------------------------------------------
     # 1. 실거래가 데이터 파일 경로 설정
     # ---------------------------------------------
     filepath = "data/3_(전체)아파트(매매)_실거래가_20251129130725.xlsx"
 
     print("\n[INFO] 실거래가 데이터 로딩 중...")
-    trans_df = load_transaction_data(filepath)
+    trans_df = load_transaction_data(filepath, verbose=verbose)
 
     if trans_df.empty:
         print("[ERROR] 실거래가 데이터가 비어 있습니다. 프로그램을 종료합니다.")
@@ -73,7 +77,7 @@ def main():
     if not selected_area:
         print("[ERROR] 평형 선택 실패")
         return
-    print(f"\n[최종 선택] {selected_gu} {selected_apt} {selected_area}")
+    print(f"\n[최종 선택] {selected_gu} {selected_apt} {format_area(selected_area)}")
 
     # ---------------------------------------------
     # 5. 선택된 조건으로 원본 실거래가 샘플 10건 출력
@@ -89,7 +93,7 @@ def main():
         c for c in ["gu", "dong", "apt_name", "area", "year", "month", "day", "price_10k"]
         if c in sample.columns
     ]
-    print(sample[cols_to_show])
+    print(sample[cols_to_show].to_string(formatters={"area": format_area}))
 
     # ---------------------------------------------
     # 6. 전처리: 단일 아파트/평형 데이터 필터링
@@ -112,9 +116,10 @@ def main():
     # ---------------------------------------------
     monthly_df = add_price_direction(monthly_df, threshold=0.01)
 
-    print("\n[월별 가격 + 방향만 있는 DataFrame 미리보기]")
-    print(monthly_df.head(5))
-    print("컬럼:", monthly_df.columns.tolist())
+    if verbose:
+        print("\n[월별 가격 + 방향만 있는 DataFrame 미리보기]")
+        print(monthly_df.head(5))
+        print("컬럼:", monthly_df.columns.tolist())
 
     # ---------------------------------------------
     # 9. 금리/인구 데이터 로딩 및 merge
@@ -125,11 +130,12 @@ def main():
     monthly_rate = load_monthly_rate(rate_path)
     monthly_pop = load_monthly_population(pop_path)
 
-    print("\n[기준금리 월별 데이터 미리보기]")
-    print(monthly_rate.head(5))
+    if verbose:
+        print("\n[기준금리 월별 데이터 미리보기]")
+        print(monthly_rate.head(5))
 
-    print("\n[구별 월별 인구 데이터 미리보기]")
-    print(monthly_pop.head(5))
+        print("\n[구별 월별 인구 데이터 미리보기]")
+        print(monthly_pop.head(5))
 
     monthly_with_macro = merge_macro_to_monthly(
         monthly_df,
@@ -138,17 +144,19 @@ def main():
         monthly_pop,
     )
 
-    print("\n[월별 가격 + 금리 + 인구 데이터 미리보기]")
-    print(monthly_with_macro.head(12))
-    print("컬럼:", monthly_with_macro.columns.tolist())
+    if verbose:
+        print("\n[월별 가격 + 금리 + 인구 데이터 미리보기]")
+        print(monthly_with_macro.head(12))
+        print("컬럼:", monthly_with_macro.columns.tolist())
 
     # ---------------------------------------------
     # 10. macro 상태(rate_level, pop_trend) 생성
     # ---------------------------------------------
     state_df = add_macro_levels(monthly_with_macro)
 
-    print("\n[강화학습에 사용할 상태(state) 컬럼 미리보기]")
-    print(state_df[["ym", "mean_price", "direction", "rate_level", "pop_trend"]].head(12))
+    if verbose:
+        print("\n[강화학습에 사용할 상태(state) 컬럼 미리보기]")
+        print(state_df[["ym", "mean_price", "direction", "rate_level", "pop_trend"]].head(12))
 
     # ---------------------------------------------
     # 11. 가격 그래프 그리기 (검증용)
@@ -159,7 +167,7 @@ def main():
         plt.xticks(rotation=45)
         plt.xlabel("연-월")
         plt.ylabel("평균 실거래가(만원)")
-        plt.title(f"{selected_gu} {selected_apt} {selected_area} 월별 평균 실거래가")
+        plt.title(f"{selected_gu} {selected_apt} {format_area(selected_area)} 월별 평균 실거래가")
         plt.tight_layout()
         plt.show()
     except Exception as e:
@@ -205,14 +213,15 @@ def main():
     print("\n[평가] 학습된 정책(탐욕 정책)으로 에피소드 1회 실행")
     total_reward, steps, history = run_greedy_policy(env, Q, max_steps=100)
 
-    for h in history:
-        action_label = ["하락 예측", "보합 예측", "상승 예측"][h["action_id"]]
+    action_labels = ["하락 예측", "보합 예측", "상승 예측"]
+    for i in range(steps):
+        action_label = action_labels[history["action_id"][i]]
         print(
-            f"step={h['step']:2d} | "
-            f"현재월={h['current_ym']} → 다음월={h['next_ym']} | "
+            f"step={history['step'][i]:2d} | "
+            f"현재월={history['current_ym'][i]} → 다음월={history['next_ym'][i]} | "
             f"에이전트={action_label} | "
-            f"실제={h['true_direction_label']} | "
-            f"보상={h['reward']}"
+            f"실제={history['true_direction_label'][i]} | "
+            f"보상={history['reward'][i]}"
         )
 
     print(f"\n[평가 종료] 총 스텝 수: {steps}, 총 보상: {total_reward}")
@@ -8,13 +8,15 @@
 #  - 1개월 ahead 예측 + 12개월 시나리오 예측
 # ---------------------------------------------
 
-from typing import Tuple, List, Dict, Any
+import re
+from typing import Tuple, List, Dict, Any, Optional
 
 import numpy as np
 import pandas as pd
 
 from src.data_loader import load_transaction_data
 from src.preprocess import (
+    get_apt_index,
     filter_one_apt,
     make_monthly_panel,
     add_price_direction,
@@ -25,48 +27,66 @@ from src.macro_features import (
     merge_macro_to_monthly,
     add_macro_levels,
 )
+from src.state_encoder import encode_state_array
 from src.environment import HousingEnv
 from src.qlearning import train_q_learning, run_greedy_policy
-from src.state_encoder import encode_state  # 상태 인코딩용
 
 
 # ---------- 1. 데이터 로딩 ----------
 
-def load_all_data() -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+TRANS_PATH = "data/3_(전체)아파트(매매)_실거래가_20251129130725.xlsx"
+RATE_PATH = "data/2_기준금리_한국은행 기준금리 및 여수신금리_29140618.xlsx"
+POP_PATH = "data/1_주민등록인구_20251129142612.xlsx"
+
+
+def load_trans() -> pd.DataFrame:
     """
-    실거래가, 기준금리, 인구 데이터를 한 번에 로딩해서 반환.
+    실거래가 데이터 로딩 (+ 사이드바 목록/필터링용 (구, 아파트) 인덱스 미리 생성).
+    """
+    trans_df = load_transaction_data(TRANS_PATH)
+    get_apt_index(trans_df)
+    return trans_df
+
+
+def load_rate() -> pd.DataFrame:
+    """
+    월별 기준금리 데이터 로딩. (아파트를 선택한 뒤에만 필요)
+    """
+    return load_monthly_rate(RATE_PATH)
+
+
+def load_pop() -> pd.DataFrame:
+    """
+    구별 월별 인구 데이터 로딩. (아파트를 선택한 뒤에만 필요)
     """
-    trans_path = "data/3_(전체)아파트(매매)_실거래가_20251129130725.xlsx"
-    rate_path = "data/2_기준금리_한국은행 기준금리 및 여수신금리_29140618.xlsx"
-    pop_path = "data/1_주민등록인구_20251129142612.xlsx"
+    return load_monthly_population(POP_PATH)
 
-    trans_df = load_transaction_data(trans_path)
-    monthly_rate = load_monthly_rate(rate_path)
-    monthly_pop = load_monthly_population(pop_path)
 
-    return trans_df, monthly_rate, monthly_pop
+def load_all_data() -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    실거래가, 기준금리, 인구 데이터를 한 번에 로딩해서 반환.
+    """
+    return load_trans(), load_rate(), load_pop()
 
 
 # ---------- 2. 메뉴용 리스트 함수 ----------
 
+# 목록은 get_apt_index()에 미리 계산된 값을 사용 (전체 행 스캔 X)
+
 def get_gu_list(trans_df: pd.DataFrame) -> List[str]:
-    return sorted(trans_df["gu"].dropna().unique().tolist())
+    return get_apt_index(trans_df)["gu_list"]
 
 
 def get_apt_list(trans_df: pd.DataFrame, gu: str) -> List[str]:
-    df = trans_df[trans_df["gu"] == gu]
-    return sorted(df["apt_name"].dropna().unique().tolist())
+    return get_apt_index(trans_df)["gu_to_apts"].get(gu, [])
 
 
 def get_area_list(trans_df: pd.DataFrame, gu: str, apt: str) -> List[float]:
-    df = trans_df[
-        (trans_df["gu"] == gu) &
-        (trans_df["apt_name"] == apt)
-    ]
-    # 숫자형으로 변환 후 정렬
-    areas = pd.to_numeric(df["area"], errors="coerce").dropna().unique().tolist()
-    areas = sorted(areas)
-    return areas
+    areas = get_apt_index(trans_df)["apt_to_areas"].get((gu, apt))
+    if areas is None:
+        return []
+    # area는 로딩 시점에 이미 숫자형(float32)이고 고유값이므로 NaN만 빼고 정렬
+    return sorted(areas[~np.isnan(areas)].tolist())
 
 
 # ---------- 3. 한 아파트/평형의 state_df 생성 ----------
@@ -83,6 +103,9 @@ def build_state_df_for_apt(
     (구, 아파트, 평형)을 지정하면
     월별 가격 + 방향 + 금리 + 인구 + macro 상태(rate_level, pop_trend)를
     모두 포함한 DataFrame(state_df)을 생성해서 반환.
+
+    trans_df / monthly_rate / monthly_pop 은 st.cache_resource 로 공유되는
+    객체이므로 읽기 전용으로만 사용한다 (각 단계는 새 DataFrame을 만들어 작업).
     """
     # 1) 해당 아파트/평형 필터링
     apt_df = filter_one_apt(trans_df, selected_gu, selected_apt, selected_area)
@@ -111,38 +134,58 @@ def build_state_df_for_apt(
     if len(state_df) < 2:
         return pd.DataFrame()
 
+    # 6) 상태 ID를 미리 계산 (encode_state와 같은 식: dir_id*9 + rate_id*3 + pop_id)
+    state_df["state_id"] = encode_state_array(
+        state_df["direction"], state_df["rate_level"], state_df["pop_trend"]
+    )
+
     return state_df
 
 
 # ---------- 4-A. 1개월 ahead 예측용 함수 ----------
 
+_YM_PATTERN = re.compile(r"\d{4}-(?:0[1-9]|1[0-2])")  # 월은 01~12만 허용
+
+
+def _future_ym_labels(last_ym: str, n_months: int) -> Optional[List[str]]:
+    """
+    'YYYY-MM' 다음 n_months개월의 'YYYY-MM' 라벨을 한 번에 생성.
+    last_ym 형식이 'YYYY-MM'이 아니면 None.
+    """
+    if not _YM_PATTERN.fullmatch(last_ym):
+        return None
+    start = pd.Period(last_ym, freq="M") + 1
+    return pd.period_range(start, periods=n_months, freq="M").strftime("%Y-%m").tolist()
+
+
+def _last_state_id(state_df: pd.DataFrame) -> int:
+    """
+    state_df 마지막 행(가장 최근 월)의 상태 ID.
+    build_state_df_for_apt에서 미리 계산한 state_id 컬럼을 쓰고,
+    없으면(add_macro_levels 결과를 바로 넘긴 경우) 마지막 행만 직접 인코딩.
+    """
+    if "state_id" in state_df.columns:
+        return int(state_df["state_id"].iat[-1])
+    last = state_df.iloc[-1:]
+    return int(encode_state_array(last["direction"], last["rate_level"], last["pop_trend"])[0])
+
+
 def _predict_next_month_direction(state_df: pd.DataFrame, Q: np.ndarray) -> Dict[str, Any]:
     """
     state_df의 마지막 행(가장 최근 월)을 기준으로,
     Q-table에서 최적 행동을 골라 '다음 달 방향'을 예측한다.
     """
-    last_row = state_df.iloc[-1]
-
-    # 마지막 월의 상태를 state index로 인코딩
-    s = encode_state(
-        int(last_row["direction"]),
-        int(last_row["rate_level"]),
-        int(last_row["pop_trend"]),
-    )
+    s = _last_state_id(state_df)
 
     # Q-table에서 가장 값이 큰 action 선택
-    best_action = int(np.argmax(Q[s]))
+    best_action = int(Q[s].argmax())
     direction_label = ["하락", "보합", "상승"][best_action]
 
-    last_ym = str(last_row["ym"])
+    last_ym = str(state_df["ym"].iat[-1])
 
-    # 'YYYY-MM' → 다음 달 'YYYY-MM' 계산
-    try:
-        period = pd.Period(last_ym, freq="M")
-        next_ym = (period + 1).strftime("%Y-%m")
-    except Exception:
-        # 혹시 형식이 다르면 그냥 "다음 달"로 처리
-        next_ym = "다음 달"
+    # 'YYYY-MM' → 다음 달 'YYYY-MM' 계산 (형식이 다르면 그냥 "다음 달"로 처리)
+    next_yms = _future_ym_labels(last_ym, 1)
+    next_ym = next_yms[0] if next_yms is not None else "다음 달"
 
     return {
         "last_ym": last_ym,
@@ -176,9 +219,11 @@ def simulate_future_12months(state_df: pd.DataFrame, Q: np.ndarray) -> pd.DataFr
 
     # 과거 데이터에서 방향별 평균 변화율 계산 (없으면 fallback)
     if "pct_change" in df.columns:
-        up_mean = df.loc[df["direction"] == 1, "pct_change"].mean()
-        flat_mean = df.loc[df["direction"] == 0, "pct_change"].mean()
-        down_mean = df.loc[df["direction"] == -1, "pct_change"].mean()
+        # 방향별 평균을 groupby 한 번으로 계산
+        means = df.groupby("direction", observed=True)["pct_change"].mean()
+        up_mean = means.get(1, np.nan)
+        flat_mean = means.get(0, np.nan)
+        down_mean = means.get(-1, np.nan)
     else:
         up_mean = flat_mean = down_mean = np.nan
 
@@ -193,62 +238,48 @@ def simulate_future_12months(state_df: pd.DataFrame, Q: np.ndarray) -> pd.DataFr
     # 마지막 관측 월 기준으로 시작
     last_row = df.iloc[-1]
     current_direction = int(last_row["direction"])
-    rate_level = int(last_row["rate_level"])
-    pop_trend = int(last_row["pop_trend"])
+    last_state_id = _last_state_id(df)
     current_price = float(last_row["mean_price"])
     last_ym = str(last_row["ym"])
 
-    try:
-        period = pd.Period(last_ym, freq="M")
-    except Exception:
+    n_steps = 12
+
+    # 탐욕 정책: 상태별 최적 행동 (num_states,)
+    policy = Q.argmax(axis=1)
+
+    # rate_level, pop_trend는 여기서는 고정 가정 (단순화)
+    # → 바뀌는 것은 방향(-1/0/1)뿐이므로, 방향별 다음 행동을 길이 3 표로 만들어 둠
+    #   (state_id = dir_id*9 + (rate_id*3 + pop_id) 에서 뒷부분은 고정)
+    macro_id = last_state_id % 9
+    next_action = policy[np.arange(3) * 9 + macro_id]
+
+    # 12개월 행동 경로: 예측한 방향이 다음 step의 현재 방향이 됨
+    # (행동 0/1/2 → 방향 -1/0/1 이므로 방향 = 행동 - 1)
+    actions = np.empty(n_steps, dtype=np.int8)
+    a = next_action[current_direction + 1]
+    for i in range(n_steps):
+        actions[i] = a
+        a = next_action[a]
+
+    # 방향에 따른 평균 수익률 적용 + 누적곱으로 가격 경로 계산
+    applied_returns = np.array([down_mean, flat_mean, up_mean])[actions]
+    scenario_prices = current_price * np.cumprod(1.0 + applied_returns)
+
+    steps = np.arange(1, n_steps + 1)
+    yms = _future_ym_labels(last_ym, n_steps)
+    if yms is None:
         # ym 형식이 이상하면 그냥 인덱스로만 증가
-        period = None
-
-    action_to_direction = {0: -1, 1: 0, 2: 1}
-    direction_label_map = {-1: "하락", 0: "보합", 1: "상승"}
-    action_label_map = {0: "하락 예측", 1: "보합 예측", 2: "상승 예측"}
-
-    records = []
-
-    for step in range(1, 13):
-        # 현재 상태를 인코딩
-        s = encode_state(current_direction, rate_level, pop_trend)
-        best_action = int(np.argmax(Q[s]))
-        predicted_direction = action_to_direction[best_action]
-
-        # 방향에 따른 평균 수익률 적용
-        if predicted_direction == 1:
-            applied_return = up_mean
-        elif predicted_direction == 0:
-            applied_return = flat_mean
-        else:
-            applied_return = down_mean
-
-        # 가격 업데이트
-        current_price = current_price * (1.0 + applied_return)
-
-        # 월 증가
-        if period is not None:
-            period = period + 1
-            ym_str = period.strftime("%Y-%m")
-        else:
-            ym_str = f"+{step}개월"
-
-        records.append({
-            "step": step,
-            "ym": ym_str,
-            "predicted_direction": predicted_direction,
-            "predicted_direction_label": direction_label_map[predicted_direction],
-            "predicted_action_label": action_label_map[best_action],
-            "applied_return": applied_return,
-            "scenario_price": current_price,
-        })
-
-        # 다음 step에서 사용할 상태 업데이트
-        current_direction = predicted_direction
-        # rate_level, pop_trend는 여기서는 고정 가정 (단순화)
-
-    scenario_df = pd.DataFrame(records)
+        yms = [f"+{step}개월" for step in steps]
+
+    scenario_df = pd.DataFrame({
+        "step": steps,
+        "ym": yms,
+        "predicted_direction": actions - 1,
+        "predicted_direction_label": np.array(["하락", "보합", "상승"])[actions],
+        "predicted_action_label": np.array(["하락 예측", "보합 예측", "상승 예측"])[actions],
+        "applied_return": applied_returns,
+        "scenario_price": scenario_prices,
+    })
     return scenario_df
 
 
@@ -262,11 +293,14 @@ def train_rl_for_state_df(
     epsilon_start: float = 1.0,
     epsilon_end: float = 0.05,
     epsilon_decay: float = 0.98,
+    seed: int = 0,
 ) -> Tuple[np.ndarray, List[float], Dict[str, Any], pd.DataFrame]:
     """
     주어진 state_df에 대해 Q-learning을 수행하고,
     탐욕 정책으로 평가한 결과(1 에피소드)까지 반환.
     (1개월 ahead 예측 정보는 metrics에 포함)
+
+    seed를 고정하므로 같은 state_df + 같은 하이퍼파라미터면 결과도 항상 같다.
     """
     # 환경 생성
     env = HousingEnv(state_df)
@@ -285,14 +319,15 @@ def train_rl_for_state_df(
         epsilon_start=epsilon_start,
         epsilon_end=epsilon_end,
         epsilon_decay=epsilon_decay,
+        seed=seed,
     )
 
     # 탐욕 정책으로 평가
     total_reward, steps, history = run_greedy_policy(env, Q, max_steps=100)
 
     # 정답률 계산
-    correct = sum(1 for h in history if h["reward"] > 0)
-    wrong = sum(1 for h in history if h["reward"] < 0)
+    correct = int((history["reward"] > 0).sum())
+    wrong = int((history["reward"] < 0).sum())
     accuracy = correct / (correct + wrong) if (correct + wrong) > 0 else 0.0
 
     # 1개월 ahead 예측
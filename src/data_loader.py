@@ -1,15 +1,80 @@
+import os
+
 import pandas as pd
 
-def load_transaction_data(filepath: str) -> pd.DataFrame:
+
+# ===== parquet 캐시 (엑셀 파싱 결과 재사용) =====
+
+# 캐시에는 전처리가 끝난 DataFrame이 저장되므로,
+# 로더의 전처리 로직(컬럼/타입 등)을 바꾸면 이 값을 올려서 기존 캐시를 무효화할 것
+# (버전은 캐시 파일명에 들어감: '<filepath>.v1.parquet')
+PARQUET_CACHE_VERSION = 1
+
+
+def _parquet_cache_path(filepath: str) -> str:
+    return f"{filepath}.v{PARQUET_CACHE_VERSION}.parquet"
+
+
+def load_parquet_cache(filepath: str):
+    """
+    원본 파일(filepath)보다 최신인 현재 버전의 parquet 캐시가 있으면 읽어서 반환.
+    캐시가 없거나, 원본보다 오래됐거나, 읽기에 실패하면 None.
+    """
+    cache_path = _parquet_cache_path(filepath)
+    try:
+        if os.path.getmtime(cache_path) >= os.path.getmtime(filepath):
+            return pd.read_parquet(cache_path, engine="pyarrow")
+    except Exception:
+        # 캐시 없음 / pyarrow 미설치 / 손상된 캐시 → 엑셀에서 다시 읽음
+        pass
+    return None
+
+
+def save_parquet_cache(df: pd.DataFrame, filepath: str) -> None:
+    """
+    전처리가 끝난 DataFrame을 '<filepath>.v<버전>.parquet' 로 저장.
+    저장에 실패해도(pyarrow 미설치, 쓰기 권한 없음 등) 로딩 자체는 계속 진행.
+    """
+    cache_path = _parquet_cache_path(filepath)
+    try:
+        df.to_parquet(cache_path, engine="pyarrow", compression="zstd")
+    except Exception as e:
+        print("[WARN] parquet 캐시 저장 실패:", e)
+
+
+def format_ym(ym_int) -> pd.Series:
+    """
+    정수 연월(YYYYMM, 예: 202301)을 'YYYY-MM' 문자열로 변환.
+    그룹핑/정렬은 정수로 하고, 화면/merge용 문자열은 마지막에 한 번만 만든다.
+    """
+    ym_int = pd.Series(ym_int)
+    return (ym_int // 100).astype(str) + "-" + (ym_int % 100).astype(str).str.zfill(2)
+
+
+def load_transaction_data(filepath: str, verbose: bool = False) -> pd.DataFrame:
+    """
+    실거래가 엑셀을 읽어 컬럼명 정리 + 가격/날짜 파싱까지 한 DataFrame을 반환.
+    verbose=True 이면 원본 미리보기(head, columns)를 출력.
+    (parquet 캐시에서 읽은 경우에는 전처리된 캐시 데이터의 미리보기를 출력)
+    """
+    cached = load_parquet_cache(filepath)
+    if cached is not None:
+        if verbose:
+            print("[INFO] 실거래가 데이터 미리보기:")
+            print(cached.head())
+            print(cached.columns)
+        return cached
+
     try:
         df = pd.read_excel(filepath)
     except Exception as e:
         print("[ERROR] 파일 로딩 실패:", e)
         return pd.DataFrame()
 
-    print("[INFO] 실거래가 데이터 미리보기:")
-    print(df.head())
-    print(df.columns)
+    if verbose:
+        print("[INFO] 실거래가 데이터 미리보기:")
+        print(df.head())
+        print(df.columns)
 
     rename_map = {
         "구": "gu",
@@ -25,12 +90,32 @@ def load_transaction_data(filepath: str) -> pd.DataFrame:
     df = df.rename(columns=rename_map)
 
     if "price_10k" in df.columns:
-        df["price_10k"] = (
-            df["price_10k"].astype(str).str.replace(",", "").astype(int)
+        # 이미 문자열 컬럼이면 astype(str) 복사 없이 바로 콤마 제거 후 숫자 변환
+        # (빈 값/이상값은 NaN 처리, 결측이 없으면 int32 등 가장 작은 정수형으로)
+        price = df["price_10k"]
+        if not pd.api.types.is_string_dtype(price):
+            price = price.astype(str)
+        df["price_10k"] = pd.to_numeric(
+            price.str.replace(",", "", regex=False), errors="coerce", downcast="integer"
         )
 
     if {"year", "month", "day"}.issubset(df.columns):
-        df["date"] = pd.to_datetime(df[["year", "month", "day"]], errors="coerce")
+        # YYYYMMDD 정수 하나로 합쳐서 한 번에 파싱 (3컬럼 임시 DataFrame 생성 X)
+        # 엑셀에서 문자열로 읽힌 경우를 대비해 먼저 숫자로 변환 (이상값은 NaN → NaT)
+        year, month, day = (
+            pd.to_numeric(df[c], errors="coerce") for c in ("year", "month", "day")
+        )
+        ymd = year * 10000 + month * 100 + day
+        df["date"] = pd.to_datetime(ymd, format="%Y%m%d", errors="coerce")
         df["ym"] = df["date"].dt.strftime("%Y-%m")
 
+    # 반복값이 많은 문자열 컬럼은 category로 (== 비교가 정수 코드 비교가 되고 메모리도 절약)
+    for c in ("gu", "dong", "apt_name"):
+        if c in df.columns:
+            df[c] = df[c].astype("category")
+    if "area" in df.columns:
+        df["area"] = pd.to_numeric(df["area"], errors="coerce").astype("float32")
+
+    save_parquet_cache(df, filepath)
+
     return df
@@ -6,9 +6,18 @@
 
 from typing import Tuple, Dict, Any
 
+import numpy as np
 import pandas as pd
 
-from src.state_encoder import encode_state
+from src.state_encoder import encode_state_array
+
+
+# 방향(-1/0/1) → 로그용 라벨
+DIRECTION_LABELS = {
+    -1: "하락",
+    0: "보합",
+    1: "상승",
+}
 
 
 class HousingEnv:
@@ -52,20 +61,24 @@ class HousingEnv:
         if self.num_rows < 2:
             print("[ERROR] 월별 데이터가 2개 미만입니다. 환경을 만들 수 없습니다.")
 
+        # 상태 ID / 정답 행동을 전체 월에 대해 미리 계산 (step마다 DataFrame 접근 X)
+        #   state_id    = encode_state_array(direction, rate_level, pop_trend)
+        #   정답 행동 ID = 방향(-1/0/1) + 1  → 0(하락)/1(보합)/2(상승)
+        d = self.df["direction"].to_numpy()
+        self._states = encode_state_array(
+            d, self.df["rate_level"].to_numpy(), self.df["pop_trend"].to_numpy()
+        )
+        self._true_actions = np.clip(d + 1, 0, 2).astype(np.int8)
+        self._ym_arr = self.df["ym"].to_numpy()
+
         self.current_idx = None
 
     def _get_state(self, idx: int) -> int:
         """
-        현재 인덱스 idx에서의 상태(state_id)를 계산.
-        direction, rate_level, pop_trend 모두 사용.
+        현재 인덱스 idx에서의 상태(state_id)를 반환.
+        (direction, rate_level, pop_trend로 __init__에서 미리 계산해 둔 값)
         """
-        row = self.df.loc[idx]
-        direction = int(row["direction"])
-        rate_level = int(row["rate_level"])
-        pop_trend = int(row["pop_trend"])
-
-        state_id = encode_state(direction, rate_level, pop_trend)
-        return state_id
+        return int(self._states[idx])
 
     def reset(self) -> int:
         """
@@ -102,16 +115,9 @@ class HousingEnv:
         t = self.current_idx
         t_next = t + 1
 
-        # 실제 다음 달 방향 (direction 컬럼은 -1/0/1 값)
-        true_direction_next = int(self.df.loc[t_next, "direction"])
-
-        # 실제 방향을 ID로 바꾼 값 (0/1/2)
-        if true_direction_next < 0:
-            true_action_id = 0
-        elif true_direction_next > 0:
-            true_action_id = 2
-        else:
-            true_action_id = 1
+        # 실제 방향을 ID로 바꾼 값 (0/1/2) → 실제 다음 달 방향 (-1/0/1)
+        true_action_id = int(self._true_actions[t_next])
+        true_direction_next = true_action_id - 1
 
         # 보상 계산: 예측(action) vs 실제(true_action_id)
         reward = 1.0 if int(action) == true_action_id else -1.0
@@ -127,14 +133,10 @@ class HousingEnv:
 
         # 디버깅용 정보
         info = {
-            "current_ym": self.df.loc[t, "ym"],
-            "next_ym": self.df.loc[t_next, "ym"],
+            "current_ym": self._ym_arr[t],
+            "next_ym": self._ym_arr[t_next],
             "true_direction_next": true_direction_next,
-            "true_direction_label": {
-                -1: "하락",
-                0: "보합",
-                1: "상승"
-            }.get(true_direction_next, "알수없음"),
+            "true_direction_label": DIRECTION_LABELS.get(true_direction_next, "알수없음"),
         }
 
         return next_state, reward, done, info
@@ -7,8 +7,11 @@
 
 from typing import Tuple
 
+import numpy as np
 import pandas as pd
 
+from src.data_loader import load_parquet_cache, save_parquet_cache, format_ym
+
 
 # ===== 1. 기준금리: 일별 → 월별 평균 =====
 
@@ -20,6 +23,10 @@ def load_monthly_rate(filepath: str) -> pd.DataFrame:
     입력 파일 컬럼 예시: ['연', '월', '일', '기준금리']
     반환 컬럼: ['ym', 'base_rate']
     """
+    cached = load_parquet_cache(filepath)
+    if cached is not None:
+        return cached
+
     df = pd.read_excel(filepath, sheet_name="데이터")
 
     # 컬럼 이름 통일
@@ -32,20 +39,22 @@ def load_monthly_rate(filepath: str) -> pd.DataFrame:
     rename_map = {k: v for k, v in rename_map.items() if k in df.columns}
     df = df.rename(columns=rename_map)
 
-    # 연월 문자열 생성
-    df["year"] = df["year"].astype(int)
-    df["month"] = df["month"].astype(int)
-    df["ym"] = df["year"].astype(str) + "-" + df["month"].astype(str).str.zfill(2)
+    # 정수 연월(YYYYMM) 생성 → 그룹핑은 정수 키로
+    df["ym_int"] = (
+        df["year"].to_numpy(dtype=np.int32) * 100 + df["month"].to_numpy(dtype=np.int32)
+    )
 
     # 월별 평균금리 집계
-    monthly_rate = (
-        df.groupby("ym")
-        .agg(base_rate=("base_rate", "mean"))
-        .reset_index()
-        .sort_values("ym")
-        .reset_index(drop=True)
+    # (sort=True 로 이미 연월 순으로 정렬된 결과가 나오므로 추가 정렬 X)
+    monthly_rate = df.groupby("ym_int", sort=True, as_index=False).agg(
+        base_rate=("base_rate", "mean"),
     )
 
+    # 출력용 'YYYY-MM' 문자열은 집계 후(행 수가 줄어든 뒤)에 생성
+    monthly_rate.insert(0, "ym", format_ym(monthly_rate.pop("ym_int")))
+
+    save_parquet_cache(monthly_rate, filepath)
+
     return monthly_rate
 
 
@@ -63,6 +72,10 @@ def load_monthly_population(filepath: str) -> pd.DataFrame:
 
     반환 컬럼: ['gu', 'ym', 'population']
     """
+    cached = load_parquet_cache(filepath)
+    if cached is not None:
+        return cached
+
     df = pd.read_excel(filepath, sheet_name="데이터")
 
     # 0행은 설명 행이 섞여 있으므로 제거
@@ -77,49 +90,44 @@ def load_monthly_population(filepath: str) -> pd.DataFrame:
     # 분기 컬럼들만 선택 (gu, sex 제외)
     quarter_cols = [c for c in df.columns if c not in ["gu", "sex"]]
 
-    records = []
-
-    for _, row in df.iterrows():
-        gu = row["gu"]
-
-        for col in quarter_cols:
-            # 예: col = "2023 1/4"
-            try:
-                year_str, q_str = str(col).split()
-                year = int(year_str)
-                quarter = int(q_str.split("/")[0])
-            except Exception:
-                continue
-
-            pop = row[col]
-
-            if pd.isna(pop):
-                continue
-
-            # 각 분기를 해당하는 3개월로 펼치기
-            if quarter == 1:
-                months = [1, 2, 3]
-            elif quarter == 2:
-                months = [4, 5, 6]
-            elif quarter == 3:
-                months = [7, 8, 9]
-            else:  # 4분기
-                months = [10, 11, 12]
-
-            for m in months:
-                ym = f"{year}-{m:02d}"
-                records.append({"gu": gu, "ym": ym, "population": pop})
-
-    monthly_pop = pd.DataFrame(records)
-
-    # 혹시 중복이 있을 수 있으니 평균으로 정리
-    monthly_pop = (
-        monthly_pop.groupby(["gu", "ym"])
-        .agg(population=("population", "mean"))
-        .reset_index()
-        .sort_values(["gu", "ym"])
-        .reset_index(drop=True)
+    # wide → long: (gu, 분기컬럼, 인구) 한 행씩
+    long = df.melt(
+        id_vars=["gu"],
+        value_vars=quarter_cols,
+        var_name="yq",
+        value_name="population",
     )
+    long["population"] = pd.to_numeric(long["population"], errors="coerce")
+    long = long.dropna(subset=["population"])
+
+    # 분기 컬럼명 파싱 (예: "2023 1/4" → year=2023, quarter=1), 형식이 다르면 제외
+    yq = long["yq"].astype(str).str.extract(r"^(\d+)\s+(\d+)/")
+    valid = yq.notna().all(axis=1).to_numpy()
+    long = long[valid]
+    year = yq.loc[valid, 0].astype(int).to_numpy()
+    quarter = yq.loc[valid, 1].astype(int).to_numpy()
+    quarter = np.where(np.isin(quarter, [1, 2, 3]), quarter, 4)  # 그 외는 4분기로 처리
+
+    # 각 분기를 해당하는 3개월로 펼치기 (행마다 3번 반복 + 0/1/2개월 offset)
+    n = len(long)
+    month = np.repeat((quarter - 1) * 3 + 1, 3) + np.tile([0, 1, 2], n)
+    year = np.repeat(year, 3)
+
+    monthly_pop = pd.DataFrame({
+        "gu": np.repeat(long["gu"].to_numpy(), 3),
+        "ym_int": (year * 100 + month).astype(np.int32),
+        "population": np.repeat(long["population"].to_numpy(), 3),
+    })
+
+    # 혹시 중복이 있을 수 있으니 평균으로 정리 (sort=True 로 (gu, ym) 순 정렬까지 한 번에)
+    monthly_pop = monthly_pop.groupby(
+        ["gu", "ym_int"], sort=True, as_index=False, observed=True
+    ).agg(population=("population", "mean"))
+
+    # 출력용 'YYYY-MM' 문자열은 집계 후에 생성
+    monthly_pop.insert(1, "ym", format_ym(monthly_pop.pop("ym_int")))
+
+    save_parquet_cache(monthly_pop, filepath)
 
     return monthly_pop
 
@@ -144,13 +152,13 @@ def merge_macro_to_monthly(
 
     반환: monthly_df에 base_rate, population 컬럼이 추가된 DataFrame
     """
-    df = monthly_df.copy()
+    # merge / boolean 인덱싱은 항상 새 DataFrame을 반환하므로 입력을 미리 copy 하지 않음
 
     # 기준금리 merge (전체 공통, ym 기준)
-    df = df.merge(monthly_rate, on="ym", how="left")
+    df = monthly_df.merge(monthly_rate, on="ym", how="left")
 
     # 인구 merge (구 + ym 기준) → 선택된 구만 사용
-    gu_pop = monthly_pop[monthly_pop["gu"] == selected_gu].copy()
+    gu_pop = monthly_pop[monthly_pop["gu"] == selected_gu]
     df = df.merge(gu_pop[["ym", "population"]], on="ym", how="left")
 
     return df
@@ -174,30 +182,15 @@ def add_macro_levels(df_macro: pd.DataFrame) -> pd.DataFrame:
     df = df_macro.copy().reset_index(drop=True)
 
     # ---- 금리 수준(rate_level) ----
-    def _rate_level(r):
-        if pd.isna(r):
-            return 1  # 정보 없으면 중간으로 처리
-        if r < 3.0:
-            return 0  # 낮음
-        elif r < 3.5:
-            return 1  # 중간
-        else:
-            return 2  # 높음
-
-    df["rate_level"] = df["base_rate"].apply(_rate_level).astype(int)
+    # 구간 [3.0, 3.5) 경계로 0/1/2, 정보 없으면(NaN) 중간(3.0 → 1)으로 처리
+    # (경계 2개뿐이므로 digitize 대신 비교 2번의 합: 3.0 이상 +1, 3.5 이상 +1)
+    base_rate = df["base_rate"].fillna(3.0).to_numpy(dtype=np.float64)
+    df["rate_level"] = (base_rate >= 3.0).view(np.int8) + (base_rate >= 3.5).view(np.int8)
 
     # ---- 인구 추세(pop_trend) ----
-    # 선택된 구의 월별 데이터만 들어 있으므로, 단순 diff 사용
-    df["pop_diff"] = df["population"].diff()
-
-    def _pop_trend(d):
-        if pd.isna(d) or d == 0:
-            return 0  # 첫 달 or 변화 없음 → 보합
-        elif d > 0:
-            return 1  # 증가
-        else:
-            return -1  # 감소
-
-    df["pop_trend"] = df["pop_diff"].apply(_pop_trend).astype(int)
+    # 선택된 구의 월별 데이터만 들어 있으므로, 단순 diff의 부호 사용
+    # (첫 달 or 변화 없음 or 정보 없음 → 보합 0)
+    pop_diff = df["population"].diff().fillna(0).to_numpy(dtype=np.float64)
+    df["pop_trend"] = np.sign(pop_diff).astype(np.int8)
 
     return df
@@ -1,20 +1,36 @@
 # src/menu_select.py
 
-def select_from_list(options, title):
+import pandas as pd
+
+from src.preprocess import get_apt_index
+
+
+def format_area(area) -> str:
+    """
+    평형(area) 표시용 문자열.
+    area는 float32로 저장되므로 84.0 → "84", 84.97 → "84.97" 처럼 표시.
+    ('32평형' 같은 문자열이면 그대로)
+    """
+    return area if isinstance(area, str) else f"{area:g}"
+
+
+def select_from_list(options, title, format_func=str):
     """
     공통 선택 메뉴 함수.
     options: 선택지 리스트
     title: 화면 상단에 표시할 제목 문자열
+    format_func: 선택지를 화면에 표시할 때 쓸 함수 (반환값은 원래 선택지)
     """
     if not options:
         print("[ERROR] 선택지가 없습니다.")
         return ""
 
-    while True:
-        print(f"\n[{title}]")
-        for i, item in enumerate(options, 1):
-            print(f"{i}. {item}")
+    # 선택지 목록은 한 번만 출력 (잘못 입력해도 목록 전체를 다시 찍지 않고 재입력만 받음)
+    print(f"\n[{title}]")
+    for i, item in enumerate(options, 1):
+        print(f"{i}. {format_func(item)}")
 
+    while True:
         choice = input("\n번호 선택: ").strip()
 
         # 숫자인지 확인
@@ -37,7 +53,11 @@ def select_gu_menu(df):
         print("[ERROR] 'gu' 컬럼이 없습니다. 데이터 컬럼명을 확인해 주세요.")
         return ""
 
-    gu_list = sorted(df["gu"].dropna().unique().tolist())
+    # 구/아파트/평형 목록은 trans_df 당 한 번만 만든 인덱스에서 꺼내 씀
+    if "apt_name" in df.columns:
+        gu_list = get_apt_index(df)["gu_list"]
+    else:
+        gu_list = sorted(df["gu"].dropna().unique().tolist())
     return select_from_list(gu_list, "1단계: 구 선택")
 
 
@@ -49,8 +69,7 @@ def select_apt_menu(df, selected_gu):
         print("[ERROR] 'gu' 또는 'apt_name' 컬럼이 없습니다.")
         return ""
 
-    sub = df[df["gu"] == selected_gu]
-    apt_list = sorted(sub["apt_name"].dropna().unique().tolist())
+    apt_list = get_apt_index(df)["gu_to_apts"].get(selected_gu, [])
 
     if not apt_list:
         print(f"[ERROR] {selected_gu} 내에 아파트 데이터가 없습니다.")
@@ -71,15 +90,17 @@ def select_area_menu(df, selected_gu, selected_apt):
         print("[ERROR] 'gu', 'apt_name', 'area' 컬럼이 없습니다.")
         return ""
 
-    sub = df[(df["gu"] == selected_gu) & (df["apt_name"] == selected_apt)]
+    areas = get_apt_index(df)["apt_to_areas"].get((selected_gu, selected_apt))
 
-    if sub.empty:
+    if areas is None:
         print(f"[ERROR] {selected_gu} {selected_apt} 데이터가 없습니다.")
         return ""
 
-    area_list = sub["area"].dropna().unique().tolist()
+    area_list = areas[~pd.isna(areas)].tolist()
 
     # 정렬: 숫자/문자 섞여 있을 수 있으므로 문자열 기준 정렬
     area_list = sorted(area_list, key=lambda x: str(x))
 
-    return select_from_list(area_list, f"3단계: {selected_gu} {selected_apt} 평형 선택")
+    return select_from_list(
+        area_list, f"3단계: {selected_gu} {selected_apt} 평형 선택", format_func=format_area
+    )
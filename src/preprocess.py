@@ -5,9 +5,61 @@
 # 2) 전월 대비 가격 변화율 + 방향(label) 계산
 # ---------------------------------------------
 
+import weakref
+from typing import Dict, Any
+
 import pandas as pd
 import numpy as np
 
+from src.data_loader import format_ym
+
+
+# trans_df 별 (구, 아파트) 조회 인덱스 캐시: id(trans_df) → (weakref, index)
+_APT_INDEX_CACHE: Dict[int, Any] = {}
+
+
+def get_apt_index(trans_df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    전체 실거래가 데이터(trans_df)에 대해 (구, 아파트명) 조회용 인덱스를
+    한 번만 만들어 두고 재사용한다. (매번 전체 행을 boolean mask로 훑지 않도록)
+
+    return: dict
+        - positions  : {(gu, apt_name): 행 위치(ndarray)}
+        - gu_list    : 정렬된 구 리스트
+        - gu_to_apts : {gu: 정렬된 아파트명 리스트}
+        - apt_to_areas: {(gu, apt_name): 평형 고유값 ndarray} (area 컬럼 없으면 빈 dict)
+    """
+    key = id(trans_df)
+    cached = _APT_INDEX_CACHE.get(key)
+    if cached is not None and cached[0]() is trans_df:
+        return cached[1]
+
+    grouped = trans_df.groupby(["gu", "apt_name"], sort=True, observed=True)
+    positions = grouped.indices
+
+    gu_to_apts: Dict[str, list] = {}
+    for gu, apt in positions:
+        gu_to_apts.setdefault(gu, []).append(apt)
+    for apts in gu_to_apts.values():
+        apts.sort()
+
+    index = {
+        "positions": positions,
+        "gu_list": sorted(trans_df["gu"].dropna().unique().tolist()),
+        "gu_to_apts": gu_to_apts,
+        # area 컬럼이 없는 데이터(구/아파트 메뉴만 쓰는 경우)는 빈 dict
+        "apt_to_areas": (
+            grouped["area"].unique().to_dict() if "area" in trans_df.columns else {}
+        ),
+    }
+
+    # trans_df 가 사라지면 캐시 항목도 같이 정리
+    _APT_INDEX_CACHE[key] = (
+        weakref.ref(trans_df, lambda _ref, k=key: _APT_INDEX_CACHE.pop(k, None)),
+        index,
+    )
+    return index
+
 
 def filter_one_apt(trans_df: pd.DataFrame,
                    gu: str,
@@ -19,22 +71,31 @@ def filter_one_apt(trans_df: pd.DataFrame,
 
     return: 필터링된 DataFrame (날짜/가격 포함)
     """
-    cond = (
-        (trans_df["gu"] == gu) &
-        (trans_df["apt_name"] == apt_name) &
-        (trans_df["area"] == area)
-    )
-    df_apt = trans_df[cond].copy()
+    # (구, 아파트명)은 미리 만든 인덱스로 해당 행만 꺼내고, 평형만 mask로 필터
+    # (iloc / boolean 인덱싱 결과는 이미 새 DataFrame이므로 따로 copy 하지 않음)
+    positions = get_apt_index(trans_df)["positions"].get((gu, apt_name))
+    if positions is None:
+        df_apt = trans_df.iloc[0:0]
+    else:
+        sub = trans_df.iloc[positions]
+        df_apt = sub[sub["area"] == area]
 
     if df_apt.empty:
         print(f"[WARN] {gu} {apt_name} {area} 에 해당하는 데이터가 없습니다.")
         return df_apt
 
-    # ym 컬럼이 없다면 year, month로 생성
-    if "ym" not in df_apt.columns and {"year", "month"}.issubset(df_apt.columns):
-        df_apt["year"] = df_apt["year"].astype(int)
-        df_apt["month"] = df_apt["month"].astype(int)
-        df_apt["ym"] = df_apt["year"].astype(str) + "-" + df_apt["month"].astype(str).str.zfill(2)
+    # 정수 연월(YYYYMM) 컬럼 추가 (월별 집계는 이 정수 키로 수행)
+    # 파싱에 성공한 date 기준으로 만들어 ym 과 항상 일치시킴
+    # (날짜 파싱 실패(NaT) 행은 <NA> → ym 이 NaN 인 것과 같이 집계에서 제외)
+    if "date" in df_apt.columns:
+        date = df_apt["date"]
+        df_apt = df_apt.assign(ym_int=(date.dt.year * 100 + date.dt.month).astype("Int32"))
+    elif "ym" not in df_apt.columns and {"year", "month"}.issubset(df_apt.columns):
+        # date / ym 컬럼이 없다면 year, month로 생성
+        df_apt = df_apt.assign(
+            ym_int=(df_apt["year"].astype(int) * 100 + df_apt["month"].astype(int)).astype(np.int32)
+        )
+        df_apt = df_apt.assign(ym=format_ym(df_apt["ym_int"]))
 
     # 날짜 기준 정렬 (가능하면 date, 아니면 ym 기준)
     if "date" in df_apt.columns:
@@ -58,19 +119,21 @@ def make_monthly_panel(df_apt: pd.DataFrame) -> pd.DataFrame:
         print("[ERROR] 'ym' 또는 'price_10k' 컬럼이 없습니다. 전처리를 확인해 주세요.")
         return pd.DataFrame()
 
+    # 가격 파싱에 실패한(NaN) 거래는 제외 → 평균가격/거래건수가 같은 행 기준이 되고,
+    # 이상값만 있는 달이 NaN 평균가격으로 남지 않음
+    df_apt = df_apt[df_apt["price_10k"].notna()]
+
     # 월별 평균가격 + 거래건수 집계
-    monthly = (
-        df_apt
-        .groupby("ym")
-        .agg(
-            mean_price=("price_10k", "mean"),
-            deal_count=("price_10k", "size")
-        )
-        .reset_index()
+    # 정수 연월(ym_int)이 있으면 정수 키로 그룹핑 (sort=True 로 이미 정렬된 결과가 나오므로 추가 정렬 X)
+    key = "ym_int" if "ym_int" in df_apt.columns else "ym"
+    monthly = df_apt.groupby(key, sort=True, as_index=False, observed=True).agg(
+        mean_price=("price_10k", "mean"),
+        deal_count=("price_10k", "size"),
     )
 
-    # 정렬 (문자열 'YYYY-MM' 기준)
-    monthly = monthly.sort_values("ym").reset_index(drop=True)
+    # 출력용 'YYYY-MM' 문자열은 집계 후에 생성
+    if key == "ym_int":
+        monthly.insert(0, "ym", format_ym(monthly.pop("ym_int")))
 
     return monthly
 
@@ -94,19 +157,18 @@ def add_price_direction(monthly_df: pd.DataFrame,
 
     df = monthly_df.copy()
 
-    # 전월 대비 변화율: (이번달 - 저번달) / 저번달
-    df["pct_change"] = df["mean_price"].pct_change()
-
-    def _dir_from_pct(p):
-        if pd.isna(p):
-            return 0  # 첫 달은 보합(0)으로 두거나 NaN으로 둬도 됨
-        if p <= -threshold:
-            return -1
-        elif p >= threshold:
-            return 1
-        else:
-            return 0
-
-    df["direction"] = df["pct_change"].apply(_dir_from_pct)
+    # 전월 대비 변화율: (이번달 - 저번달) / 저번달  (첫 달은 NaN)
+    price = df["mean_price"].to_numpy(dtype=np.float64)
+    pct = np.empty_like(price)
+    pct[:1] = np.nan
+    pct[1:] = price[1:] / price[:-1] - 1.0
+    df["pct_change"] = pct
+
+    # NaN(첫 달)은 두 조건 모두 False → 보합(0)
+    df["direction"] = np.select(
+        [pct <= -threshold, pct >= threshold],
+        [-1, 1],
+        default=0,
+    ).astype(np.int8)
 
     return df
@@ -3,10 +3,88 @@
 # 탭형 Q-learning 알고리즘 구현
 # ---------------------------------------------
 
-from typing import Tuple, List, Dict, Any
+from typing import Tuple, List, Dict, Optional
 
 import numpy as np
 
+try:
+    from numba import njit
+except ImportError:
+    # numba가 없으면 같은 코드를 순수 Python으로 실행 (결과 동일, 속도만 느림)
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True)
+def _greedy_action(q: np.ndarray) -> int:
+    """
+    Q값 한 행(q)에서 가장 큰 행동 ID 반환 (동점이면 앞쪽 행동, np.argmax와 같은 규칙).
+    행동이 3개(하락/보합/상승)인 경우는 비교 2번으로 바로 계산.
+    """
+    if q.shape[0] == 3:
+        if q[0] >= q[1] and q[0] >= q[2]:
+            return 0
+        if q[1] >= q[2]:
+            return 1
+        return 2
+    return int(np.argmax(q))
+
+
+@njit(cache=True, fastmath=True)
+def _train_core(
+    states: np.ndarray,
+    reward_table: np.ndarray,
+    Q: np.ndarray,
+    coins: np.ndarray,
+    random_actions: np.ndarray,
+    epsilons: np.ndarray,
+    alpha: float,
+    gamma: float,
+) -> np.ndarray:
+    """
+    Q-learning 에피소드 루프 (숫자 배열만 사용 → numba로 컴파일).
+    Q는 in-place로 갱신되고, 에피소드별 총 보상 배열을 반환.
+
+    reward_table  : (T, num_actions) t 시점에서 각 행동의 보상
+    coins         : (episodes, T) ε-greedy 탐험 여부 판정용 난수
+    random_actions: (episodes, T) 탐험할 때 사용할 무작위 행동
+    epsilons      : (episodes,) 에피소드별 탐험 비율
+    """
+    episodes, num_steps = coins.shape
+    episode_rewards = np.zeros(episodes)
+
+    for ep in range(episodes):
+        epsilon = epsilons[ep]
+
+        state = states[0]
+        total_reward = 0.0
+
+        for t in range(num_steps):
+            # ε-greedy 정책
+            if coins[ep, t] < epsilon:
+                action = random_actions[ep, t]  # 무작위 행동
+            else:
+                action = _greedy_action(Q[state])  # Q값이 가장 큰 행동 선택
+
+            reward = reward_table[t, action]
+            next_state = states[t + 1]
+
+            best_next = np.max(Q[next_state])
+            td_target = reward + gamma * best_next
+            td_error = td_target - Q[state, action]
+
+            # Q 업데이트
+            Q[state, action] += alpha * td_error
+
+            state = next_state
+            total_reward += reward
+
+        episode_rewards[ep] = total_reward
+
+    return episode_rewards
+
 
 def train_q_learning(
     env,
@@ -18,56 +96,66 @@ def train_q_learning(
     epsilon_start: float = 1.0,
     epsilon_end: float = 0.1,
     epsilon_decay: float = 0.99,
+    seed: Optional[int] = None,
 ) -> Tuple[np.ndarray, List[float]]:
     """
     탭형 Q-learning으로 에이전트를 학습시키는 함수.
 
-    env        : reset(), step(action) 을 지원하는 환경 (HousingEnv)
+    env        : HousingEnv (미리 계산된 _states, _true_actions 배열을 사용)
     num_states : 상태 개수
     num_actions: 행동 개수
     episodes   : 에피소드 반복 횟수
     alpha      : 학습률
     gamma      : 할인율
     epsilon_*  : 탐험 비율 관련 파라미터
+    seed       : 탐험용 난수 seed (None이면 매번 다른 난수)
 
     return:
         Q              : (num_states, num_actions) Q-table
         episode_rewards: 각 에피소드별 총 보상 리스트
     """
-    Q = np.zeros((num_states, num_actions), dtype=float)
-    episode_rewards: List[float] = []
-
-    for ep in range(episodes):
-        state = env.reset()
-        done = False
-        total_reward = 0.0
-
-        # 에피소드마다 epsilon 서서히 감소
-        epsilon = max(epsilon_end, epsilon_start * (epsilon_decay ** ep))
-
-        while not done:
-            # ε-greedy 정책
-            if np.random.rand() < epsilon:
-                action = np.random.randint(num_actions)  # 무작위 행동
-            else:
-                action = int(np.argmax(Q[state]))        # Q값이 가장 큰 행동 선택
-
-            next_state, reward, done, info = env.step(action)
-
-            best_next = np.max(Q[next_state])
-            td_target = reward + gamma * best_next
-            td_error = td_target - Q[state, action]
-
-            # Q 업데이트
-            Q[state, action] += alpha * td_error
-
-            state = next_state
-            total_reward += reward
-
-        episode_rewards.append(total_reward)
-
-        if (ep + 1) % 50 == 0:
-            print(f"[학습] 에피소드 {ep+1:3d} / {episodes}, 총 보상 = {total_reward:.1f}, epsilon={epsilon:.3f}")
+    # Q-table은 float32로 유지 (학습 루프에서 읽고 쓰는 바이트 수 절반)
+    Q = np.zeros((num_states, num_actions), dtype=np.float32)
+
+    # HousingEnv는 행동과 무관하게 다음 상태가 정해지는 결정적 환경이므로
+    # env.step 대신 env가 미리 계산해 둔 상태/정답 배열로 학습 루프를 수행
+    #   states[t]          : t 시점의 state_id
+    #   true_actions[t]    : t 시점 행동의 정답 (= t+1 시점의 실제 방향 ID)
+    env.reset()  # 데이터가 너무 적으면 여기서 ValueError
+    states = env._states
+    true_actions = env._true_actions[1:]
+    num_steps = env.max_step_index + 1
+
+    # 보상표: 예측(action) == 실제 다음 달 방향 → +1, 아니면 -1
+    reward_table = np.where(
+        np.arange(num_actions)[None, :] == true_actions[:, None], 1.0, -1.0
+    ).astype(np.float32)
+
+    # 탐험용 난수는 함수 전용 Generator로 전체 에피소드 분량을 한 번에 생성
+    rng = np.random.default_rng(seed)
+    coins = rng.random((episodes, num_steps))
+    random_actions = rng.integers(0, num_actions, size=(episodes, num_steps))
+
+    # 에피소드마다 epsilon 서서히 감소 (스케줄 전체를 미리 계산)
+    epsilons = np.maximum(
+        epsilon_end,
+        epsilon_start * np.power(epsilon_decay, np.arange(episodes, dtype=np.float64)),
+    )
+
+    rewards = _train_core(
+        states,
+        reward_table,
+        Q,
+        coins,
+        random_actions,
+        epsilons,
+        np.float32(alpha),
+        np.float32(gamma),
+    )
+    episode_rewards: List[float] = rewards.tolist()
+
+    for ep in range(49, episodes, 50):
+        print(f"[학습] 에피소드 {ep+1:3d} / {episodes}, 총 보상 = {episode_rewards[ep]:.1f}, epsilon={epsilons[ep]:.3f}")
 
     return Q, episode_rewards
 
@@ -76,7 +164,7 @@ def run_greedy_policy(
     env,
     Q: np.ndarray,
     max_steps: int = 100
-) -> Tuple[float, int, List[Dict[str, Any]]]:
+) -> Tuple[float, int, Dict[str, np.ndarray]]:
     """
     학습된 Q-table을 이용해 탐욕 정책(ε=0)으로 에피소드 1번 실행.
 
@@ -87,34 +175,45 @@ def run_greedy_policy(
     return:
         total_reward: 총 보상
         steps       : 실제 수행된 스텝 수
-        history     : 각 스텝별 정보 딕셔너리 리스트
+        history     : 스텝별 정보를 컬럼별 배열로 담은 딕셔너리
+                      (step, current_ym, next_ym, action_id, true_direction_label, reward)
+                      → pd.DataFrame(history) 로 바로 변환 가능
     """
-    num_actions = Q.shape[1]
+    step_arr = np.arange(max_steps, dtype=np.int32)
+    current_ym_arr = np.empty(max_steps, dtype=object)
+    next_ym_arr = np.empty(max_steps, dtype=object)
+    action_arr = np.empty(max_steps, dtype=np.int8)
+    true_label_arr = np.empty(max_steps, dtype=object)
+    reward_arr = np.empty(max_steps, dtype=np.float32)
 
     state = env.reset()
     done = False
     total_reward = 0.0
     steps = 0
-    history: List[Dict[str, Any]] = []
 
     while not done and steps < max_steps:
         # 탐욕 정책: 항상 Q값이 가장 큰 행동 선택
-        action = int(np.argmax(Q[state]))
+        action = int(_greedy_action(Q[state]))
 
         next_state, reward, done, info = env.step(action)
 
-        step_info = {
-            "step": steps,
-            "current_ym": info.get("current_ym"),
-            "next_ym": info.get("next_ym"),
-            "action_id": action,
-            "true_direction_label": info.get("true_direction_label"),
-            "reward": reward,
-        }
-        history.append(step_info)
+        current_ym_arr[steps] = info.get("current_ym")
+        next_ym_arr[steps] = info.get("next_ym")
+        action_arr[steps] = action
+        true_label_arr[steps] = info.get("true_direction_label")
+        reward_arr[steps] = reward
 
         total_reward += reward
         state = next_state
         steps += 1
 
+    history = {
+        "step": step_arr[:steps],
+        "current_ym": current_ym_arr[:steps],
+        "next_ym": next_ym_arr[:steps],
+        "action_id": action_arr[:steps],
+        "true_direction_label": true_label_arr[:steps],
+        "reward": reward_arr[:steps],
+    }
+
     return total_reward, steps, history
@@ -4,6 +4,8 @@
 # 상태 ID로 변환하는 유틸 모음
 # ---------------------------------------------
 
+import numpy as np
+
 # 방향(direction) → 상태 ID 매핑
 # -1: 하락, 0: 보합, 1: 상승
 DIRECTION_TO_ID = {
@@ -103,10 +105,25 @@ def encode_state(direction: int, rate_level: int, pop_trend: int) -> int:
       - pop_id  : 0~2  (감소/보합/증가)
 
     state_id = dir_id * 9 + rate_id * 3 + pop_id
+             = (direction + 1) * 9 + rate_id * 3 + (pop_trend + 1)
+
+    direction / pop_trend 는 -1/0/1 값이 들어온다고 가정하고
+    (DIRECTION_TO_ID / POP_TREND_TO_ID 와 같은 결과) 산술식으로 바로 계산.
+    rate_level 만 0~2 범위로 클리핑.
     """
-    dir_id = encode_direction(direction)      # 0~2
-    rate_id = encode_rate_level(rate_level)   # 0~2
-    pop_id = encode_pop_trend(pop_trend)      # 0~2
+    return int((int(direction) + 1) * 9
+               + max(0, min(2, int(rate_level))) * 3
+               + (int(pop_trend) + 1))
 
-    state_id = dir_id * 9 + rate_id * 3 + pop_id
-    return int(state_id)
+
+def encode_state_array(direction, rate_level, pop_trend) -> np.ndarray:
+    """
+    encode_state()의 배열 버전. 월별 컬럼 전체를 한 번에 상태 ID로 변환.
+    (direction, rate_level, pop_trend: 같은 길이의 배열 / Series)
+
+    return: int8 ndarray (값 범위 0~26)
+    """
+    d = np.asarray(direction, dtype=np.int8)
+    r = np.clip(np.asarray(rate_level, dtype=np.int8), 0, 2)
+    p = np.asarray(pop_trend, dtype=np.int8)
+    return ((d + 1) * 9 + r * 3 + (p + 1)).astype(np.int8)